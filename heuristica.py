@@ -1,8 +1,18 @@
 import random
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 from dataclasses import dataclass
 from collections import defaultdict
 import numpy as np
+try:
+    from numba import config, cuda, njit, prange, set_num_threads
+    NUMBA_DISPONIVEL = True
+except ImportError:
+    # Sem Numba o fitness é calculado apenas com NumPy
+    NUMBA_DISPONIVEL = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda funcao: funcao
 import time
 import psutil
 import os
@@ -23,34 +33,137 @@ class Funcionario:
     senioridade: int  # Nível de senioridade (1-5)
     carga_atual: float = 0.0
 
+@njit(cache=True)
+def _fitness_kernel(solucao, peso, carga_horaria):
+    """Kernel compilado do fitness: acumula as cargas e calcula a diferença
+    máxima e a penalidade em uma única passada sobre os funcionários."""
+    cargas = np.zeros(carga_horaria.shape[0])
+    for i in range(solucao.size):
+        if solucao[i] >= 0:
+            cargas[solucao[i]] += peso[i]
+    
+    carga_maxima = -np.inf
+    carga_minima = np.inf
+    penalidade = 0.0
+    for k in range(cargas.size):
+        carga = cargas[k]
+        if carga > carga_maxima:
+            carga_maxima = carga
+        if carga < carga_minima:
+            carga_minima = carga
+        if carga > carga_horaria[k]:
+            penalidade += (carga - carga_horaria[k]) * 1000
+    
+    return (carga_maxima - carga_minima) + penalidade
+
+@njit(parallel=True, cache=True)
+def _fitness_populacao(populacao, peso, carga_horaria):
+    """Avalia cada indivíduo da população em paralelo."""
+    fitness = np.empty(populacao.shape[0])
+    for i in prange(populacao.shape[0]):
+        fitness[i] = _fitness_kernel(populacao[i], peso, carga_horaria)
+    return fitness
+
+def _fitness_populacao_numpy(populacao, peso, carga_horaria):
+    """Versão apenas NumPy do fitness da população, usada quando o Numba não
+    está disponível."""
+    num_solucoes, num_funcionarios = populacao.shape[0], carga_horaria.shape[0]
+    atribuidos = populacao >= 0
+    
+    # Desloca os índices de cada solução para acumular todas as cargas num único bincount
+    posicoes = populacao + (np.arange(num_solucoes) * num_funcionarios)[:, None]
+    cargas = np.bincount(posicoes[atribuidos],
+                         weights=np.broadcast_to(peso, populacao.shape)[atribuidos],
+                         minlength=num_solucoes * num_funcionarios)
+    cargas = cargas.reshape(num_solucoes, num_funcionarios)
+    
+    diferenca_maxima = np.ptp(cargas, axis=1)
+    penalidade = np.maximum(cargas - carga_horaria, 0.0).sum(axis=1) * 1000
+    
+    return diferenca_maxima + penalidade
+
+# Maior categoria representável na máscara de bits (int64) das especialidades
+_MAX_CATEGORIA = 62
+
+# Limites do kernel CUDA: as cargas de um indivíduo ficam em memória compartilhada
+_MAX_FUNCIONARIOS_GPU = 256
+_THREADS_POR_BLOCO = 128
+
+if NUMBA_DISPONIVEL:
+    @cuda.jit
+    def _fitness_populacao_gpu(populacao, peso, carga_horaria, fitness):
+        """Kernel CUDA do fitness: um bloco por indivíduo, com as threads do
+        bloco acumulando as cargas em memória compartilhada."""
+        cargas = cuda.shared.array(_MAX_FUNCIONARIOS_GPU, dtype=np.float64)
+        i = cuda.blockIdx.x
+        t = cuda.threadIdx.x
+        num_funcionarios = carga_horaria.shape[0]
+        
+        for k in range(t, num_funcionarios, cuda.blockDim.x):
+            cargas[k] = 0.0
+        cuda.syncthreads()
+        
+        for j in range(t, populacao.shape[1], cuda.blockDim.x):
+            if populacao[i, j] >= 0:
+                cuda.atomic.add(cargas, populacao[i, j], peso[j])
+        cuda.syncthreads()
+        
+        # Com poucos funcionários, uma única thread faz a redução final
+        if t == 0:
+            carga_maxima = -np.inf
+            carga_minima = np.inf
+            penalidade = 0.0
+            for k in range(num_funcionarios):
+                carga = cargas[k]
+                if carga > carga_maxima:
+                    carga_maxima = carga
+                if carga < carga_minima:
+                    carga_minima = carga
+                if carga > carga_horaria[k]:
+                    penalidade += (carga - carga_horaria[k]) * 1000
+            fitness[i] = (carga_maxima - carga_minima) + penalidade
+
 class AlgoritmoGenetico:
     def __init__(self, 
                  num_geracoes: int = 100,
                  tamanho_populacao: int = 50,
                  taxa_mutacao: float = 0.1,
-                 taxa_crossover: float = 0.8):
+                 taxa_crossover: float = 0.8,
+                 taxa_mutacao_por_gene: Optional[float] = None,
+                 semente: Optional[int] = None,
+                 usar_gpu: bool = False):
         self.num_geracoes = num_geracoes
         self.tamanho_populacao = tamanho_populacao
         self.taxa_mutacao = taxa_mutacao
+        # Sem valor explícito, usa taxa_mutacao / número de processos, o que
+        # mantém a média de um gene mutado a cada 1/taxa_mutacao soluções
+        self.taxa_mutacao_por_gene = taxa_mutacao_por_gene
         self.taxa_crossover = taxa_crossover
+        self.usar_gpu = usar_gpu
+        self._usar_gpu = False
         self.funcionarios: List[Funcionario] = []
         self.processos: List[Processo] = []
         self.melhor_solucao = None
         self.melhor_fitness = float('inf')
         self.tempo_inicio = 0
         self.memoria_inicial = 0
+        self._processo_psutil = psutil.Process(os.getpid())
+        # Único gerador usado por todos os operadores; `semente` torna a execução reproduzível
+        self._rng = np.random.default_rng(semente)
+        
+        # Usa um thread do Numba por núcleo físico na avaliação da população
+        if NUMBA_DISPONIVEL:
+            set_num_threads(min(psutil.cpu_count(logical=False) or 1, config.NUMBA_NUM_THREADS))
 
     def iniciar_metricas(self):
         """Inicia o monitoramento de métricas."""
-        self.tempo_inicio = time.time()
-        processo = psutil.Process(os.getpid())
-        self.memoria_inicial = processo.memory_info().rss
+        self.tempo_inicio = time.perf_counter()
+        self.memoria_inicial = self._processo_psutil.memory_info().rss
 
     def finalizar_metricas(self):
         """Finaliza o monitoramento e retorna as métricas."""
-        tempo_total = time.time() - self.tempo_inicio
-        processo = psutil.Process(os.getpid())
-        memoria_final = processo.memory_info().rss
+        tempo_total = time.perf_counter() - self.tempo_inicio
+        memoria_final = self._processo_psutil.memory_info().rss
         memoria_usada = memoria_final - self.memoria_inicial
         return tempo_total, memoria_usada
 
@@ -60,157 +173,199 @@ class AlgoritmoGenetico:
     def adicionar_processo(self, processo: Processo):
         self.processos.append(processo)
 
-    def gerar_solucao_aleatoria(self) -> Dict[int, List[int]]:
-        """Gera uma solução aleatória válida."""
-        solucao = defaultdict(list)
-        funcionarios_disponiveis = self.funcionarios.copy()
-        
-        # Ordena processos por urgência (mais urgentes primeiro)
-        processos_ordenados = sorted(self.processos, key=lambda p: -p.urgencia)
+    def _preparar_indices(self):
+        """Monta os arrays (SoA) usados no fitness e os funcionários compatíveis por categoria."""
+        self.peso_arr = np.array([p.peso for p in self.processos], dtype=np.float64)
+        self.carga_arr = np.array([f.carga_horaria for f in self.funcionarios], dtype=np.float64)
         
-        for processo in processos_ordenados:
-            # Encontra funcionários compatíveis
-            funcionarios_compativeis = [
-                f for f in funcionarios_disponiveis 
-                if processo.categoria in f.especialidades
-            ]
-            
-            if not funcionarios_compativeis:
-                continue
-                
-            # Escolhe funcionário aleatoriamente entre os compatíveis
-            funcionario = random.choice(funcionarios_compativeis)
-            solucao[funcionario.id].append(processo.id)
-            
-        return dict(solucao)
-
-    def calcular_fitness(self, solucao: Dict[int, List[int]]) -> float:
-        """Calcula o fitness de uma solução."""
-        # Reinicia cargas dos funcionários
-        for f in self.funcionarios:
-            f.carga_atual = 0.0
+        # Mantém pesos e cargas na GPU durante toda a execução
+        self._usar_gpu = (self.usar_gpu and NUMBA_DISPONIVEL and cuda.is_available()
+                          and len(self.funcionarios) <= _MAX_FUNCIONARIOS_GPU)
+        if self.usar_gpu and not self._usar_gpu:
+            print("GPU indisponível para o fitness; usando a CPU.")
+        if self._usar_gpu:
+            self._peso_gpu = cuda.to_device(self.peso_arr)
+            self._carga_gpu = cuda.to_device(self.carga_arr)
         
-        # Calcula cargas
-        for func_id, processos_ids in solucao.items():
-            funcionario = next(f for f in self.funcionarios if f.id == func_id)
-            for proc_id in processos_ids:
-                processo = next(p for p in self.processos if p.id == proc_id)
-                funcionario.carga_atual += processo.peso
+        # Especialidades de cada funcionário como máscara de bits (bit c = categoria c),
+        # o que limita as categorias aos bits de um int64
+        categorias = {c for f in self.funcionarios for c in f.especialidades}
+        categorias.update(p.categoria for p in self.processos)
+        invalidas = sorted(c for c in categorias if not 0 <= c <= _MAX_CATEGORIA)
+        if invalidas:
+            raise ValueError(f"Categorias devem estar entre 0 e {_MAX_CATEGORIA}; "
+                             f"recebidas: {invalidas}")
+        self._func_mask = np.array([sum(1 << c for c in f.especialidades) for f in self.funcionarios],
+                                   dtype=np.int64)
+        self._cats = np.array([p.categoria for p in self.processos], dtype=np.int64)
+        num_categorias = max(int(np.bitwise_or.reduce(self._func_mask, initial=0)).bit_length(),
+                             int(self._cats.max(initial=-1)) + 1)
         
-        # Calcula diferença máxima de carga
-        cargas = [f.carga_atual for f in self.funcionarios]
-        diferenca_maxima = max(cargas) - min(cargas)
+        self._func_por_categoria: Dict[int, List[int]] = {}
+        for categoria in range(num_categorias):
+            indices = np.flatnonzero((self._func_mask >> categoria) & 1)
+            if indices.size:
+                self._func_por_categoria[categoria] = indices.tolist()
         
-        # Penaliza soluções inválidas
-        penalidade = 0
-        for f in self.funcionarios:
-            if f.carga_atual > f.carga_horaria:
-                penalidade += (f.carga_atual - f.carga_horaria) * 1000
+        # Tabela categoria x funcionários compatíveis (preenchida com -1), que
+        # permite sortear os funcionários de todos os processos de uma vez
+        largura = max([len(v) for v in self._func_por_categoria.values()] + [1])
+        self._tabela = np.full((num_categorias, largura), -1, dtype=np.int32)
+        for categoria, indices in self._func_por_categoria.items():
+            self._tabela[categoria, :len(indices)] = indices
         
-        return diferenca_maxima + penalidade
+        # Quantidade de funcionários compatíveis com cada processo
+        self._contagens = (self._tabela >= 0).sum(axis=1)[self._cats]
 
-    def crossover(self, pai1: Dict[int, List[int]], pai2: Dict[int, List[int]]) -> Dict[int, List[int]]:
-        """Realiza o crossover entre duas soluções."""
-        if random.random() > self.taxa_crossover:
-            return pai1.copy()
-        
-        filho = defaultdict(list)
-        todos_processos = set()
-        
-        # Coleta todos os processos dos pais
-        for processos in pai1.values():
-            todos_processos.update(processos)
-        for processos in pai2.values():
-            todos_processos.update(processos)
-        
-        # Distribui processos aleatoriamente
-        for processo_id in todos_processos:
-            funcionarios_compativeis = [
-                f for f in self.funcionarios 
-                if self.processos[processo_id].categoria in f.especialidades
-            ]
-            
-            if funcionarios_compativeis:
-                funcionario = random.choice(funcionarios_compativeis)
-                filho[funcionario.id].append(processo_id)
-        
-        return dict(filho)
+    def _solucao_para_dict(self, solucao: np.ndarray) -> Dict[int, List[int]]:
+        """Converte uma solução em array para o formato {funcionario_id: [processo_id]}."""
+        resultado = defaultdict(list)
+        for i, idx in enumerate(solucao):
+            if idx >= 0:
+                resultado[self.funcionarios[idx].id].append(self.processos[i].id)
+        return dict(resultado)
 
-    def mutacao(self, solucao: Dict[int, List[int]]):
-        """Aplica mutação em uma solução."""
-        if random.random() > self.taxa_mutacao:
-            return
-        
-        # Escolhe um processo aleatoriamente
-        todos_processos = []
-        for processos in solucao.values():
-            todos_processos.extend(processos)
-        
-        if not todos_processos:
-            return
-            
-        processo_id = random.choice(todos_processos)
-        processo = self.processos[processo_id]
-        
-        # Remove o processo de sua atribuição atual
-        for func_id in solucao:
-            if processo_id in solucao[func_id]:
-                solucao[func_id].remove(processo_id)
-                break
+    def gerar_populacao(self, tamanho: int) -> np.ndarray:
+        """Gera uma população aleatória válida (tamanho x processos).
+
+        Cada linha é uma solução em que a posição i guarda o índice do funcionário
+        responsável pelo processo i (-1 quando não há funcionário compatível).
+        """
+        # Processos sem funcionário compatível sorteiam a coluna 0, que vale -1
+        sorteios = self._rng.integers(0, np.maximum(self._contagens, 1),
+                                      size=(tamanho, len(self.processos)))
+        return self._tabela[self._cats[None, :], sorteios]
+
+    def gerar_solucao_aleatoria(self) -> np.ndarray:
+        """Gera uma solução aleatória válida."""
+        return self.gerar_populacao(1)[0]
+
+    def calcular_fitness(self, solucao: np.ndarray) -> float:
+        """Calcula o fitness de uma solução."""
+        if not NUMBA_DISPONIVEL:
+            return float(_fitness_populacao_numpy(solucao[None, :], self.peso_arr, self.carga_arr)[0])
+        return _fitness_kernel(solucao, self.peso_arr, self.carga_arr)
+
+    def calcular_fitness_populacao(self, populacao: np.ndarray) -> np.ndarray:
+        """Calcula o fitness de toda a população (tamanho_populacao x processos) de uma vez."""
+        if self._usar_gpu:
+            fitness = cuda.device_array(populacao.shape[0], dtype=np.float64)
+            _fitness_populacao_gpu[populacao.shape[0], _THREADS_POR_BLOCO](
+                cuda.to_device(populacao), self._peso_gpu, self._carga_gpu, fitness)
+            return fitness.copy_to_host()
+        if not NUMBA_DISPONIVEL:
+            return _fitness_populacao_numpy(populacao, self.peso_arr, self.carga_arr)
+        return _fitness_populacao(populacao, self.peso_arr, self.carga_arr)
+
+    def crossover(self, pai1: np.ndarray, pai2: np.ndarray,
+                  saida: Optional[np.ndarray] = None) -> np.ndarray:
+        """Realiza o crossover uniforme entre duas soluções.
+
+        Também aceita lotes de pais (uma solução por linha), gerando todos os
+        filhos de uma vez. Como os dois pais só usam funcionários compatíveis
+        com cada processo, o filho também é válido. Se `saida` for informado,
+        os filhos são escritos nele em vez de num array novo.
+        """
+        # Sem crossover o filho é uma cópia do primeiro pai
+        sem_crossover = self._rng.random(pai1.shape[:-1] + (1,)) > self.taxa_crossover
+        mascara = (self._rng.random(pai1.shape) < 0.5) | sem_crossover
+        if saida is None:
+            return np.where(mascara, pai1, pai2)
         
-        # Reatribui o processo
-        funcionarios_compativeis = [
-            f for f in self.funcionarios 
-            if processo.categoria in f.especialidades
-        ]
+        np.copyto(saida, pai2)
+        np.copyto(saida, pai1, where=mascara)
+        return saida
+
+    def mutacao(self, solucao: np.ndarray):
+        """Aplica mutação em uma solução (ou lote de soluções), no próprio array.
+
+        Cada gene é sorteado novamente entre os funcionários compatíveis com
+        o processo, com probabilidade taxa_mutacao_por_gene.
+        """
+        taxa = self.taxa_mutacao_por_gene
+        if taxa is None:
+            taxa = self.taxa_mutacao / max(len(self.processos), 1)
         
-        if funcionarios_compativeis:
-            funcionario = random.choice(funcionarios_compativeis)
-            solucao[funcionario.id].append(processo_id)
+        # Escolhe os genes a mutar e reatribui seus processos
+        genes = np.nonzero(self._rng.random(solucao.shape) < taxa)
+        processos = genes[-1]
+        sorteios = self._rng.integers(0, np.maximum(self._contagens[processos], 1))
+        solucao[genes] = self._tabela[self._cats[processos], sorteios]
 
-    def executar(self) -> Dict[int, List[int]]:
+    def executar(self) -> Optional[Dict[int, List[int]]]:
         """Executa o algoritmo genético."""
+        self._preparar_indices()
+        
+        # Aquece o JIT para que a compilação não entre nas métricas
+        self.calcular_fitness_populacao(np.full((1, len(self.processos)), -1, dtype=np.int32))
+        
         self.iniciar_metricas()
         
-        # Gera população inicial
-        populacao = [self.gerar_solucao_aleatoria() for _ in range(self.tamanho_populacao)]
+        # Gera população inicial (uma solução por linha) e um segundo buffer
+        # do mesmo formato; as gerações alternam entre os dois. O fitness de
+        # cada população é mantido em buffers paralelos
+        buffers = [
+            self.gerar_populacao(self.tamanho_populacao),
+            np.empty((self.tamanho_populacao, len(self.processos)), dtype=np.int32),
+        ]
+        fitness_buffers = [
+            self.calcular_fitness_populacao(buffers[0]),
+            np.empty(self.tamanho_populacao),
+        ]
+        metade = self.tamanho_populacao // 2
         
         for geracao in range(self.num_geracoes):
-            # Calcula fitness para cada solução
-            fitness_populacao = [(sol, self.calcular_fitness(sol)) for sol in populacao]
-            fitness_populacao.sort(key=lambda x: x[1])
+            populacao = buffers[geracao & 1]
+            nova_populacao = buffers[(geracao + 1) & 1]
+            fitness = fitness_buffers[geracao & 1]
+            novo_fitness = fitness_buffers[(geracao + 1) & 1]
             
-            # Atualiza melhor solução
-            if fitness_populacao[0][1] < self.melhor_fitness:
-                self.melhor_solucao = fitness_populacao[0][0]
-                self.melhor_fitness = fitness_populacao[0][1]
+            # Seleciona as melhores soluções (sem ordenar a população inteira)
+            elite = np.argpartition(fitness, metade)[:metade]
             
-            # Seleciona melhores soluções
-            melhores_solucoes = [sol for sol, _ in fitness_populacao[:self.tamanho_populacao//2]]
+            # Atualiza melhor solução
+            melhor = elite[fitness[elite].argmin()]
+            if fitness[melhor] < self.melhor_fitness:
+                self.melhor_solucao = populacao[melhor].copy()
+                self.melhor_fitness = float(fitness[melhor])
             
-            # Gera nova população
-            nova_populacao = melhores_solucoes.copy()
+            # Gera nova população: elite no início (com o fitness já conhecido),
+            # filhos no restante
+            nova_populacao[:metade] = populacao[elite]
+            novo_fitness[:metade] = fitness[elite]
+            melhores_solucoes = nova_populacao[:metade]
             
-            while len(nova_populacao) < self.tamanho_populacao:
-                pai1 = random.choice(melhores_solucoes)
-                pai2 = random.choice(melhores_solucoes)
-                filho = self.crossover(pai1, pai2)
-                self.mutacao(filho)
-                nova_populacao.append(filho)
+            num_filhos = self.tamanho_populacao - metade
+            pais1 = melhores_solucoes[self._rng.integers(0, metade, size=num_filhos)]
+            pais2 = melhores_solucoes[self._rng.integers(0, metade, size=num_filhos)]
+            filhos = self.crossover(pais1, pais2, saida=nova_populacao[metade:])
+            self.mutacao(filhos)
             
-            populacao = nova_populacao
+            # Só os filhos precisam ser avaliados
+            novo_fitness[metade:] = self.calcular_fitness_populacao(filhos)
             
             if geracao % 10 == 0:
                 print(f"Geração {geracao}: Melhor fitness = {self.melhor_fitness}")
         
+        # Os filhos da última geração já foram avaliados; confere se algum supera o melhor
+        if self.num_geracoes > 0:
+            fitness = fitness_buffers[self.num_geracoes & 1]
+            melhor = fitness[metade:].argmin() + metade
+            if fitness[melhor] < self.melhor_fitness:
+                self.melhor_solucao = buffers[self.num_geracoes & 1][melhor].copy()
+                self.melhor_fitness = float(fitness[melhor])
+        
         tempo, memoria = self.finalizar_metricas()
         print(f"\nMétricas de Execução:")
         print(f"Tempo de execução: {tempo:.4f} segundos")
         print(f"Memória utilizada: {memoria / 1024 / 1024:.2f} MB")
         
-        return self.melhor_solucao
+        # Converte para o formato de dicionário apenas no retorno
+        if self.melhor_solucao is None:
+            return None
+        return self._solucao_para_dict(self.melhor_solucao)
 
-def gerar_dados_teste():
+def gerar_dados_teste(semente: Optional[int] = None):
     # Gerar funcionários
     funcionarios = [
         Funcionario(1, {1, 2}, 44.0, senioridade=3),    # Especialista em categorias 1 e 2
@@ -225,11 +380,12 @@ def gerar_dados_teste():
     ]
     
     # Gerar processos
+    rng = random.Random(semente)
     processos = []
     for i in range(100):
-        categoria = random.randint(1, 5)
-        urgencia = random.randint(1, 5)
-        tempo = random.uniform(0.5, 5.0)
+        categoria = rng.randint(1, 5)
+        urgencia = rng.randint(1, 5)
+        tempo = rng.uniform(0.5, 5.0)
         peso = (urgencia * 10) / tempo
         processos.append(Processo(
             id=i,
@@ -260,15 +416,17 @@ def main():
     
     # Imprimir resultados
     print("\nMelhor solução encontrada:")
+    funcionarios_por_id = {f.id: f for f in funcionarios}
+    processos_por_id = {p.id: p for p in processos}
     for funcionario_id, processos_ids in melhor_solucao.items():
-        funcionario = next(f for f in funcionarios if f.id == funcionario_id)
+        funcionario = funcionarios_por_id[funcionario_id]
         print(f"\nFuncionário {funcionario_id} (Senioridade: {funcionario.senioridade}):")
         print(f"Total de processos: {len(processos_ids)}")
-        carga_total = sum(processos[pid].peso for pid in processos_ids)
+        carga_total = sum(processos_por_id[pid].peso for pid in processos_ids)
         print(f"Carga total: {carga_total:.2f}")
         print("Processos:")
         for pid in processos_ids:
-            p = processos[pid]
+            p = processos_por_id[pid]
             print(f"  - Processo {pid}: Categoria {p.categoria}, "
                   f"Urgência {p.urgencia}, Peso {p.peso:.2f}")
 